@@ -1,78 +1,419 @@
 import sys
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                           QHBoxLayout, QLabel, QScrollArea, QMenuBar, QMenu, 
-                           QFileDialog, QFrame, QSizePolicy, QGridLayout,
+                           QHBoxLayout, QScrollArea, QMenuBar, QMenu, 
+                           QFileDialog, QSizePolicy, QGridLayout,
                            QInputDialog, QSpacerItem, QMessageBox)
-from PyQt6.QtCore import Qt, QMimeData, QSize, QTimer
-from PyQt6.QtGui import QPixmap, QClipboard, QAction, QContextMenuEvent
+from PyQt6.QtCore import (Qt, QMimeData, QSize, QTimer, QRect, QObject, QRunnable,
+                          QThreadPool, pyqtSignal)
+from PyQt6.QtGui import (QPixmap, QPixmapCache, QImage, QImageReader, QClipboard, QAction,
+                         QContextMenuEvent, QPainter, QPalette)
 import os
 import math
 import json
+import hashlib
+import tempfile
+import threading
+import stat
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# デコード済み画像のキャッシュ上限 (KB)
+# 同じパス・同じサイズのページはこのキャッシュの QPixmap を共有する
+PIXMAP_CACHE_LIMIT = 256 * 1024
+QPixmapCache.setCacheLimit(PIXMAP_CACHE_LIMIT)
+
+# 縮小表示用サムネイルの保存先と最大辺の長さ
+THUMBNAIL_DIR = os.path.join(tempfile.gettempdir(), 'book_layout_thumbs')
+THUMBNAIL_SIZE = 1024
+THUMBNAIL_DIR_LIMIT = 512 * 1024 * 1024  # 保存先の合計サイズの上限 (バイト)
+_thumbnail_paths = {}
+_thumbnail_dir_ready = None
+_thumbnail_dir_lock = threading.Lock()
+_image_sizes = {}
+
+# 表示範囲の先で画像を先読みするスプレッド数
+PREFETCH_SPREADS = 4
+
+def get_image_size(image_path):
+    """画像のサイズをヘッダだけ読んで返す (読めない場合は None)"""
+    if image_path not in _image_sizes:
+        size = QImageReader(image_path).size()
+        if size.isValid() and size.width() > 0 and size.height() > 0:
+            _image_sizes[image_path] = (size.width(), size.height())
+        else:
+            _image_sizes[image_path] = None
+    return _image_sizes[image_path]
+
+def select_source_path(image_path, page_width, page_height):
+    """小さく表示する場合はサムネイルを縮小元に使う"""
+    if max(page_width, page_height) * 2 <= THUMBNAIL_SIZE:
+        return get_thumbnail_path(image_path)
+    return image_path
+
+def find_existing_paths(paths):
+    """存在する画像パスの集合を返す
+
+    ディレクトリごとに一度だけ一覧を取得し、一覧に含まれるファイルの stat を避ける
+    """
+    entries = {}
+    existing = set()
+    for path in paths:
+        if not path:
+            continue
+        directory, name = os.path.split(path)
+        if directory not in entries:
+            try:
+                with os.scandir(directory or '.') as it:
+                    entries[directory] = {entry.name for entry in it}
+            except OSError:
+                entries[directory] = None
+        names = entries[directory]
+        # 一覧に無い名前 (大文字小文字や Unicode 正規化の違いを含む) と
+        # 一覧を取得できなかったディレクトリは個別に確認する
+        if (names is not None and name in names) or os.path.exists(path):
+            existing.add(path)
+    return existing
+
+def scaled_cache_key(image_path, scaled_width, scaled_height):
+    return f"{image_path}@{scaled_width}x{scaled_height}"
+
+def prepare_thumbnail_dir():
+    """サムネイルの保存先を用意し、使えるかどうかを返す
+
+    共有の一時ディレクトリに置くため、自分だけが読み書きできるディレクトリで
+    なければ使わない (他のユーザーに画像を見られたり差し替えられたりしないように)
+    """
+    global _thumbnail_dir_ready
+    with _thumbnail_dir_lock:
+        if _thumbnail_dir_ready is None:
+            _thumbnail_dir_ready = False
+            try:
+                os.makedirs(THUMBNAIL_DIR, mode=0o700, exist_ok=True)
+                st = os.lstat(THUMBNAIL_DIR)
+                if stat.S_ISDIR(st.st_mode):
+                    if not hasattr(os, 'getuid'):
+                        # Windows の一時ディレクトリはユーザーごとに分かれている
+                        _thumbnail_dir_ready = True
+                    elif st.st_uid == os.getuid():
+                        if stat.S_IMODE(st.st_mode) & 0o077:
+                            os.chmod(THUMBNAIL_DIR, 0o700)
+                        _thumbnail_dir_ready = True
+                if _thumbnail_dir_ready:
+                    prune_thumbnail_dir()
+            except OSError:
+                _thumbnail_dir_ready = False
+        return _thumbnail_dir_ready
+
+def prune_thumbnail_dir():
+    """保存先の合計サイズが上限を超えていたら古いサムネイルから削除する"""
+    thumbnails = []
+    total_size = 0
+    with os.scandir(THUMBNAIL_DIR) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False):
+                st = entry.stat(follow_symlinks=False)
+                thumbnails.append((st.st_mtime, st.st_size, entry.path))
+                total_size += st.st_size
+
+    thumbnails.sort()
+    for _, size, path in thumbnails:
+        if total_size <= THUMBNAIL_DIR_LIMIT:
+            break
+        try:
+            os.remove(path)
+            total_size -= size
+        except OSError:
+            pass
+
+def get_thumbnail_path(image_path):
+    """縮小表示用のサムネイルのパスを返す (無ければ作成する)
+
+    元画像が十分小さい場合や作成に失敗した場合は元画像のパスを返す
+    """
+    thumb_path = _thumbnail_paths.get(image_path)
+    if thumb_path is not None:
+        return thumb_path
+
+    thumb_path = image_path
+    try:
+        mtime = os.path.getmtime(image_path)
+    except OSError:
+        return image_path
+    if not prepare_thumbnail_dir():
+        _thumbnail_paths[image_path] = image_path
+        return image_path
+
+    digest = hashlib.sha1(f"{image_path}:{mtime}".encode('utf-8')).hexdigest()
+    cached_path = os.path.join(THUMBNAIL_DIR, digest + ".png")
+    if os.path.exists(cached_path):
+        thumb_path = cached_path
+    else:
+        reader = QImageReader(image_path)
+        size = reader.size()
+        if size.isValid() and max(size.width(), size.height()) > THUMBNAIL_SIZE:
+            image = reader.read()
+            if not image.isNull():
+                thumb = image.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE,
+                                     Qt.AspectRatioMode.KeepAspectRatio,
+                                     Qt.TransformationMode.SmoothTransformation)
+                # 書きかけのファイルを読まないよう一時ファイル経由で保存する
+                temp_path = f"{cached_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    if thumb.save(temp_path, "PNG"):
+                        os.replace(temp_path, cached_path)
+                        thumb_path = cached_path
+                except OSError:
+                    # 保存できない場合は元画像を使う
+                    thumb_path = image_path
+
+    _thumbnail_paths[image_path] = thumb_path
+    return thumb_path
+
+def load_source_pixmap(image_path):
+    """元画像をキャッシュ経由で読み込む"""
+    pixmap = QPixmapCache.find(image_path)
+    if pixmap is None:
+        pixmap = QPixmap(image_path)
+        QPixmapCache.insert(image_path, pixmap)
+    return pixmap
+
+def load_scaled_pixmap(image_path, page_width, page_height, scaled_width, scaled_height):
+    """縮小済み画像を (パス, 幅, 高さ) をキーにキャッシュ経由で取得する"""
+    key = scaled_cache_key(image_path, scaled_width, scaled_height)
+    scaled_pixmap = QPixmapCache.find(key)
+    if scaled_pixmap is None:
+        # 縮小元 (サムネイルか元画像) はキャッシュに無い場合だけ選ぶ
+        source_path = select_source_path(image_path, page_width, page_height)
+        pixmap = load_source_pixmap(source_path)
+        scaled_pixmap = pixmap.scaled(scaled_width, scaled_height,
+                                      Qt.AspectRatioMode.KeepAspectRatio,
+                                      Qt.TransformationMode.SmoothTransformation)
+        QPixmapCache.insert(key, scaled_pixmap)
+    return scaled_pixmap
+
+def clear_image_caches():
+    """画像のキャッシュを破棄する
+
+    キャッシュはパスだけをキーにしているため、他のアプリで編集された画像を
+    読み直せるよう Book の読み込み時や画像の選択時に呼ぶ
+    """
+    QPixmapCache.clear()
+    _image_sizes.clear()
+    _thumbnail_paths.clear()
+
+class ImageLoadTask(QRunnable):
+    """ワーカースレッドで画像を読み込んで縮小する (QPixmap は使わない)"""
+    def __init__(self, loader, image_path, page_width, page_height, scaled_width, scaled_height,
+                 generation=None):
+        super().__init__()
+        self.loader = loader
+        self.image_path = image_path
+        self.page_width = page_width
+        self.page_height = page_height
+        self.scaled_width = scaled_width
+        self.scaled_height = scaled_height
+        self.generation = generation
+
+    def run(self):
+        # 失敗しても必ず完了を通知する (通知しないと読み込み待ちのまま残り、二度と要求されない)
+        image = QImage()
+        try:
+            # 取り消された先読みは読み込まずに完了だけを通知する
+            if self.generation is None or self.generation == self.loader.prefetch_generation:
+                source_path = select_source_path(self.image_path, self.page_width, self.page_height)
+                loaded = QImage(source_path)
+                if not loaded.isNull():
+                    image = loaded.scaled(self.scaled_width, self.scaled_height,
+                                          Qt.AspectRatioMode.KeepAspectRatio,
+                                          Qt.TransformationMode.SmoothTransformation)
+        except Exception:
+            image = QImage()
+        finally:
+            self.loader.imageReady.emit(self.image_path, self.scaled_width, self.scaled_height, image)
+
+class ImageLoader(QObject):
+    """ページ画像の読み込みをスレッドプールに投げ、結果をメインスレッドに通知する"""
+    imageReady = pyqtSignal(str, int, int, QImage)
 
-class PageNumberLabel(QLabel):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.setMinimumHeight(20)  # 番号表示用の最小高さを確保
-        self.setVisible(True)
+        self.pending = {}  # (パス, 幅, 高さ) -> 先読みの世代 (表示用の読み込みは None)
+        self.prefetch_generation = 0
+        self.imageReady.connect(self.on_image_ready)
+
+    def request(self, image_path, page_width, page_height, scaled_width, scaled_height, prefetch=False):
+        key = (image_path, scaled_width, scaled_height)
+        generation = self.prefetch_generation if prefetch else None
+        # 表示用の読み込み中か、同じ世代の先読み中なら投げ直さない
+        # (取り消された世代の先読みや、先読み中の画像が表示対象になった場合は投げ直す)
+        if key in self.pending:
+            pending_generation = self.pending[key]
+            if pending_generation is None or (prefetch and pending_generation == generation):
+                return
+        self.pending[key] = generation
+        # 表示中のページの読み込みを先読みより優先する
+        priority = 0 if prefetch else 1
+        QThreadPool.globalInstance().start(
+            ImageLoadTask(self, image_path, page_width, page_height, scaled_width, scaled_height,
+                          generation),
+            priority)
+
+    def cancel_prefetch(self):
+        """まだ処理されていない先読みを取り消す"""
+        self.prefetch_generation += 1
+
+    def on_image_ready(self, image_path, scaled_width, scaled_height, image):
+        self.pending.pop((image_path, scaled_width, scaled_height), None)
 
 class PageWidget(QWidget):
+    """1ページ分の画像とページ番号を子ウィジェットを使わずに直接描画する"""
+    NUMBER_HEIGHT = 20  # 番号表示用の高さ
+
     def __init__(self, page_width=300, page_number=1, parent=None):
         super().__init__(parent)
         self.page_number = page_number
-
-        # メインレイアウト
-        self.layout = QVBoxLayout(self)
-        self.layout.setSpacing(0)
-        self.layout.setContentsMargins(0, 0, 0, 0)
-
-        # 画像表示用のラベル
-        self.image_label = QLabel()
-        self.image_label.setFrameStyle(QFrame.Shape.Box)
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.layout.addWidget(self.image_label)
-
-        # ページ番号ラベル
-        self.number_label = PageNumberLabel()
-        self.layout.addWidget(self.number_label)
+        self.number_visible = True
+        self.pixmap = None
 
         self.image_path = ""
+        self.scaled_key = None
+        self.scaled_size_key = None
+        self.scaled_size_value = None
+        self.applied_width = None
         self.page_width = page_width
         self.update_size()
         self.update_page_number(page_number)
 
-    def update_size(self):
+    def update_size(self, fast=False):
+        # 幅が変わっていなければ何もしない
+        if self.page_width == self.applied_width:
+            return
+        self.applied_width = self.page_width
         self.height = int(self.page_width * 1.414)
-        self.image_label.setFixedSize(self.page_width, self.height)
-        if self.image_path:
-            self.load_image(self.image_path)
+        self.update_fixed_size()
+        # 表示中の画像だけを新しいサイズで描き直す
+        if self.image_path and self.scaled_key is not None:
+            self.load_image(self.image_path, fast)
+
+    def update_fixed_size(self):
+        number_height = self.NUMBER_HEIGHT if self.number_visible else 0
+        self.setFixedSize(self.page_width, self.height + number_height)
 
     def update_page_number(self, number, visible=True):
+        if number == self.page_number and visible == self.number_visible:
+            return
         self.page_number = number
-        self.number_label.setText(str(number))
-        self.number_label.setVisible(visible)
+        if visible != self.number_visible:
+            self.number_visible = visible
+            self.update_fixed_size()
+        self.update()
+
+    def set_pixmap(self, pixmap):
+        self.pixmap = pixmap
+        self.update()
+
+    def clear_pixmap(self):
+        if self.pixmap is not None:
+            self.pixmap = None
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        image_rect = QRect(0, 0, self.page_width, self.height)
+
+        if self.pixmap is not None:
+            # 表示サイズと画像のサイズが異なる場合は描画時に拡大縮小する
+            scaled_size = self.scaled_size() or (self.pixmap.width(), self.pixmap.height())
+            pixmap_rect = QRect(0, 0, *scaled_size)
+            pixmap_rect.moveCenter(image_rect.center())
+            fast = self.scaled_key is not None and self.scaled_key[3]
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, not fast)
+            painter.drawPixmap(pixmap_rect, self.pixmap)
+
+        # 枠線
+        painter.setPen(self.palette().color(QPalette.ColorRole.WindowText))
+        painter.drawRect(image_rect.adjusted(0, 0, -1, -1))
+
+        if self.number_visible:
+            number_rect = QRect(0, self.height, self.page_width, self.NUMBER_HEIGHT)
+            painter.drawText(number_rect, Qt.AlignmentFlag.AlignCenter, str(self.page_number))
+
+    def scaled_size(self):
+        """現在のページサイズに収まる画像の表示サイズを返す"""
+        # 同じ画像・同じ幅なら前回の計算結果を使う
+        if self.scaled_size_key == (self.image_path, self.page_width):
+            return self.scaled_size_value
+        self.scaled_size_key = (self.image_path, self.page_width)
+        self.scaled_size_value = None
+
+        image_size = get_image_size(self.image_path)
+        if image_size is None:
+            return None
+
+        # 縦横比の比較と縮小サイズの計算は整数演算で行う
+        image_width, image_height = image_size
+        if image_width * self.height > self.page_width * image_height:
+            scaled_width = self.page_width
+            scaled_height = self.page_width * image_height // image_width
+        else:
+            scaled_height = self.height
+            scaled_width = self.height * image_width // image_height
+        self.scaled_size_value = (scaled_width, scaled_height)
+        return self.scaled_size_value
 
-    def load_image(self, image_path):
+    def load_image(self, image_path, fast=False):
         self.image_path = image_path
         if image_path:
-            pixmap = QPixmap(image_path)
-            page_aspect = self.page_width / self.height
-            image_aspect = pixmap.width() / pixmap.height()
+            scaled_size = self.scaled_size()
+            if scaled_size is None:
+                self.clear_pixmap()
+                self.scaled_key = None
+                return
+            scaled_width, scaled_height = scaled_size
 
-            if image_aspect > page_aspect:
-                scaled_width = self.page_width
-                scaled_height = int(self.page_width / image_aspect)
-            else:
-                scaled_height = self.height
-                scaled_width = int(self.height * image_aspect)
+            # 同じパス・同じサイズで表示済みなら再設定しない (高品質の画像は操作中にもそのまま使う)
+            if self.scaled_key in ((image_path, scaled_width, scaled_height, fast),
+                                   (image_path, scaled_width, scaled_height, False)):
+                return
+            if fast:
+                # 操作中は新しい画像を作らず、表示中の画像を描画時に拡大縮小する
+                if self.pixmap is not None and self.scaled_key is not None and self.scaled_key[0] == image_path:
+                    self.scaled_key = (image_path, scaled_width, scaled_height, True)
+                    self.update()
+                    return
+                # 表示中の画像が無ければ縮小済みのキャッシュだけを使い、元画像は読み込まない
+                scaled_pixmap = QPixmapCache.find(scaled_cache_key(image_path, scaled_width, scaled_height))
+                if scaled_pixmap is None:
+                    self.clear_pixmap()
+                    self.scaled_key = None
+                    return
+                self.set_pixmap(scaled_pixmap)
+                self.scaled_key = (image_path, scaled_width, scaled_height, False)
+                return
 
-            scaled_pixmap = pixmap.scaled(scaled_width, scaled_height,
-                                        Qt.AspectRatioMode.KeepAspectRatio,
-                                        Qt.TransformationMode.SmoothTransformation)
-            self.image_label.setPixmap(scaled_pixmap)
+            self.set_pixmap(load_scaled_pixmap(image_path, self.page_width, self.height,
+                                               scaled_width, scaled_height))
+            self.scaled_key = (image_path, scaled_width, scaled_height, False)
         else:
-            self.image_label.clear()
+            self.clear_pixmap()
             self.image_path = ""
+            self.scaled_key = None
+
+    def set_image_path(self, image_path):
+        """画像パスだけを設定し、読み込みは表示されるまで遅らせる"""
+        self.image_path = image_path
+        self.clear_pixmap()
+        self.scaled_key = None
+        self.scaled_size_key = None
+
+    def release_image(self):
+        """画面外のページの画像を解放する (パスは保持する)"""
+        if self.scaled_key is not None:
+            self.clear_pixmap()
+            self.scaled_key = None
 
     def contextMenuEvent(self, event: QContextMenuEvent):
         menu = QMenu(self)
@@ -111,7 +452,7 @@ class PageWidget(QWidget):
             "Images (*.png *.jpg *.jpeg *.bmp *.gif)"
         )
         if file_name:
-            self.load_image(file_name)
+            self.window().set_page_image(self, file_name)
 
     def copy_image_path(self):
         if self.image_path:
@@ -132,16 +473,25 @@ class SpreadWidget(QWidget):
         layout.addWidget(self.right_page)
         self.setLayout(layout)
 
-    def update_page_size(self, width):
+    def update_page_size(self, width, fast=False):
         self.left_page.page_width = width
         self.right_page.page_width = width
-        self.left_page.update_size()
-        self.right_page.update_size()
+        self.left_page.update_size(fast)
+        self.right_page.update_size(fast)
+
+    def release_images(self):
+        self.left_page.release_image()
+        self.right_page.release_image()
 
     def update_page_numbers(self, start_number, visible=True):
         self.left_page.update_page_number(start_number, visible)
         self.right_page.update_page_number(start_number + 1, visible)
 
+    def set_image_paths(self, left_path, right_path):
+        for page, image_path in ((self.left_page, left_path), (self.right_page, right_path)):
+            if page.image_path != image_path:
+                page.set_image_path(image_path)
+
     def get_page_index(self, page):
         """指定されたページが左か右かを返す"""
         if page == self.left_page:
@@ -157,9 +507,24 @@ class BookLayoutApp(QMainWindow):
         self.setGeometry(100, 100, 1200, 800)
 
         self.current_page_width = 300
+        # 各スプレッドの左右ページの画像パス (スプレッドのウィジェットはこの配列の表示用)
+        self.left_paths = []
+        self.right_paths = []
         self.spreads = []
+        self._page_to_spread = {}
         self.page_number_start = 1
         self.show_page_numbers = True
+        self._resizing = False
+        self._pending_size_update = False
+        self._visible_spreads = []
+        self._last_first_visible = 0
+        self._scroll_direction = 1
+        self._layout_columns = None
+        self._layout_spreads = []
+
+        # 画像の読み込みはワーカースレッドで行う
+        self.image_loader = ImageLoader(self)
+        self.image_loader.imageReady.connect(self.on_image_ready)
 
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -173,32 +538,186 @@ class BookLayoutApp(QMainWindow):
         self.scroll_area.setWidgetResizable(True)
         self.main_layout.addWidget(self.scroll_area)
 
+        # 表示範囲のスプレッドだけ画像を読み込むためのタイマー
+        # (レイアウト確定後に実行するため 0ms で遅延させる)
+        self.visible_timer = QTimer()
+        self.visible_timer.setSingleShot(True)
+        self.visible_timer.timeout.connect(self.update_visible_spreads)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.update_visible_spreads)
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self.update_visible_spreads)
+
         self.create_menu_bar()
         self.add_new_spread()
 
         self.resize_timer = QTimer()
         self.resize_timer.setSingleShot(True)
-        self.resize_timer.timeout.connect(self.reorganize_layout)
+        self.resize_timer.timeout.connect(self.apply_pending_layout)
+
+        # 操作が落ち着いたら高品質で描き直すためのタイマー
+        self.upgrade_timer = QTimer()
+        self.upgrade_timer.setSingleShot(True)
+        self.upgrade_timer.timeout.connect(self.upgrade_image_quality)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        self.resize_timer.start(100)
+        self._resizing = True
+        self.resize_timer.start(250)
 
-    def reorganize_layout(self):
-        while self.grid_layout.count():
-            item = self.grid_layout.takeAt(0)
-            if item.widget():
-                self.grid_layout.removeWidget(item.widget())
+    def apply_pending_layout(self):
+        """リサイズ・ズーム操作が落ち着いた後にまとめてレイアウトを更新する"""
+        if self._pending_size_update:
+            self._pending_size_update = False
+            self.update_all_page_sizes()
+        else:
+            self.reorganize_layout()
+        self.upgrade_timer.start(250)
+
+    def upgrade_image_quality(self):
+        self._resizing = False
+        self.update_visible_spreads()
+
+    def update_visible_spreads(self):
+        """表示範囲内のスプレッドの画像を読み込み、範囲外の画像を解放する
+
+        レイアウトの確定前でも正しく判定できるよう、スプレッドの位置は
+        行番号と固定の行の高さから求める
+        """
+        visible_spreads = []
+        visible_indices = []
+        if self.spreads:
+            spreads_per_row = self._layout_columns or 1
+            row_height = self.spreads[0].sizeHint().height() + self.grid_layout.verticalSpacing()
+            top = self.grid_layout.contentsMargins().top()
+            scroll_y = self.scroll_area.verticalScrollBar().value()
+            viewport_height = self.scroll_area.viewport().height()
+            first_row = max(0, (scroll_y - top) // row_height)
+            last_row = max(first_row, (scroll_y + viewport_height - top) // row_height)
+            first_visible = first_row * spreads_per_row
+            last_visible = min(len(self.spreads) - 1, (last_row + 1) * spreads_per_row - 1)
+
+            for i, spread in enumerate(self.spreads):
+                if first_visible <= i <= last_visible:
+                    visible_spreads.append(spread)
+                    visible_indices.append(i)
+                else:
+                    spread.release_images()
+        self._visible_spreads = visible_spreads
+
+        for spread in visible_spreads:
+            self.request_page_image(spread.left_page)
+            self.request_page_image(spread.right_page)
+
+        if visible_indices:
+            self.prefetch_spreads(visible_indices[0], visible_indices[-1])
+
+    def prefetch_spreads(self, first_visible, last_visible):
+        """スクロール方向の先にあるスプレッドの画像をキャッシュに先読みする"""
+        if self._resizing:
+            return
+
+        # 表示位置が変わっていなければ直前のスクロール方向を維持する
+        if first_visible > self._last_first_visible:
+            direction = 1
+        elif first_visible < self._last_first_visible:
+            direction = -1
+        else:
+            direction = self._scroll_direction
+        self._last_first_visible = first_visible
+        # スクロール方向が逆転したら反対側の先読みを取り消す
+        if direction != self._scroll_direction:
+            self._scroll_direction = direction
+            self.image_loader.cancel_prefetch()
+
+        if direction > 0:
+            indices = range(last_visible + 1, min(len(self.spreads), last_visible + 1 + PREFETCH_SPREADS))
+        else:
+            indices = range(first_visible - 1, max(-1, first_visible - 1 - PREFETCH_SPREADS), -1)
+
+        for i in indices:
+            spread = self.spreads[i]
+            for page in (spread.left_page, spread.right_page):
+                if not page.image_path:
+                    continue
+                scaled_size = page.scaled_size()
+                if scaled_size is None:
+                    continue
+                if QPixmapCache.find(scaled_cache_key(page.image_path, *scaled_size)) is None:
+                    self.image_loader.request(page.image_path, page.page_width, page.height,
+                                              *scaled_size, prefetch=True)
+
+    def request_page_image(self, page):
+        """キャッシュにあればすぐに表示し、無ければワーカースレッドで読み込む"""
+        if not page.image_path:
+            return
+        if self._resizing and page.pixmap is not None:
+            # 操作中は表示中の画像を引き伸ばすだけにし、GUI スレッドでは読み込まない
+            page.load_image(page.image_path, fast=True)
+            return
+
+        scaled_size = page.scaled_size()
+        if scaled_size is None:
+            return
+        if page.scaled_key == (page.image_path, *scaled_size, False):
+            return
+        if QPixmapCache.find(scaled_cache_key(page.image_path, *scaled_size)) is not None:
+            page.load_image(page.image_path)
+            return
+
+        self.image_loader.request(page.image_path, page.page_width, page.height, *scaled_size)
+
+    def on_image_ready(self, image_path, scaled_width, scaled_height, image):
+        if image.isNull():
+            return
+        # QPixmap への変換はメインスレッドで行う
+        scaled_pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(scaled_cache_key(image_path, scaled_width, scaled_height), scaled_pixmap)
+        for spread in self._visible_spreads:
+            for page in (spread.left_page, spread.right_page):
+                if page.image_path == image_path and page.scaled_size() == (scaled_width, scaled_height):
+                    page.set_pixmap(scaled_pixmap)
+                    page.scaled_key = (image_path, scaled_width, scaled_height, False)
 
+    def reorganize_layout(self):
         available_width = self.scroll_area.viewport().width()
         spread_width = (self.current_page_width * 2) + 30
 
         spreads_per_row = max(1, math.floor((available_width + 20) / (spread_width + 20)))
 
-        for i, spread in enumerate(self.spreads):
-            row = i // spreads_per_row
-            col = i % spreads_per_row
-            self.grid_layout.addWidget(spread, row, col)
+        # 列数もスプレッドの並びも変わっていなければ配置し直さない
+        if spreads_per_row != self._layout_columns or self.spreads != self._layout_spreads:
+            # 位置が変わったスプレッドだけを配置し直す
+            moved = []
+            for i, spread in enumerate(self.spreads):
+                row = i // spreads_per_row
+                col = i % spreads_per_row
+                item = self.grid_layout.itemAtPosition(row, col)
+                if item is None or item.widget() is not spread:
+                    moved.append((spread, row, col))
+
+            self.scroll_widget.setUpdatesEnabled(False)
+            try:
+                for spread, _, _ in moved:
+                    self.grid_layout.removeWidget(spread)
+                for spread, row, col in moved:
+                    self.grid_layout.addWidget(spread, row, col)
+            finally:
+                self.scroll_widget.setUpdatesEnabled(True)
+
+            self._layout_columns = spreads_per_row
+            self._layout_spreads = list(self.spreads)
+
+        self.update_pixmap_cache_limit(spreads_per_row)
+
+        self.visible_timer.start(0)
+
+    def update_pixmap_cache_limit(self, spreads_per_row):
+        """表示中のページ分の縮小画像が常にキャッシュに収まるよう上限を調整する"""
+        page_height = int(self.current_page_width * 1.414)
+        row_height = page_height + PageWidget.NUMBER_HEIGHT + self.grid_layout.spacing()
+        rows = self.scroll_area.viewport().height() // row_height + 2
+        display_kb = spreads_per_row * 2 * rows * self.current_page_width * page_height * 4 // 1024
+        # 元画像用の領域に加え、拡大縮小前後の 2 段階分の縮小画像を確保する
+        QPixmapCache.setCacheLimit(PIXMAP_CACHE_LIMIT + display_kb * 2)
 
     def create_menu_bar(self):
         menubar = self.menuBar()
@@ -243,12 +762,35 @@ class BookLayoutApp(QMainWindow):
         zoom_out_action.triggered.connect(self.zoom_out)
 
     def add_new_spread(self):
-        start_number = self.page_number_start + (len(self.spreads) * 2)
-        spread = SpreadWidget(self.current_page_width, start_number)
-        spread.update_page_numbers(start_number, self.show_page_numbers)
-        self.spreads.append(spread)
+        self.left_paths.append("")
+        self.right_paths.append("")
+        self.refresh_spreads()
+
+    def refresh_spreads(self):
+        """画像パスの配列に合わせてスプレッドの数と各ページの画像を揃える"""
+        count = len(self.left_paths)
+        if len(self.spreads) != count:
+            while len(self.spreads) > count:
+                self.spreads.pop().setParent(None)
+            while len(self.spreads) < count:
+                start_number = self.page_number_start + (len(self.spreads) * 2)
+                spread = SpreadWidget(self.current_page_width, start_number)
+                spread.update_page_numbers(start_number, self.show_page_numbers)
+                self.spreads.append(spread)
+            self.rebuild_page_index()
+
+        for spread, left_path, right_path in zip(self.spreads, self.left_paths, self.right_paths):
+            spread.set_image_paths(left_path, right_path)
+
         self.reorganize_layout()
 
+    def clear_spreads(self):
+        for spread in self.spreads:
+            spread.setParent(None)
+        self.spreads.clear()
+        self.left_paths.clear()
+        self.right_paths.clear()
+
     def toggle_page_numbers(self, checked):
         self.show_page_numbers = checked
         self.update_all_page_numbers()
@@ -267,16 +809,44 @@ class BookLayoutApp(QMainWindow):
             self.update_all_page_numbers()
 
     def update_all_page_numbers(self):
-        for i, spread in enumerate(self.spreads):
-            start_number = self.page_number_start + (i * 2)
-            spread.update_page_numbers(start_number, self.show_page_numbers)
+        # 全ページの更新をまとめて 1 回の再描画にする
+        self.scroll_widget.setUpdatesEnabled(False)
+        self.scroll_widget.blockSignals(True)
+        try:
+            for i, spread in enumerate(self.spreads):
+                start_number = self.page_number_start + (i * 2)
+                spread.update_page_numbers(start_number, self.show_page_numbers)
+        finally:
+            self.scroll_widget.blockSignals(False)
+            self.scroll_widget.setUpdatesEnabled(True)
+            self.scroll_widget.update()
 
     def find_spread_and_page(self, target_page):
         """指定されたページを含むスプレッドとそのインデックスを検索"""
+        return self._page_to_spread.get(target_page, (-1, None))
+
+    def rebuild_page_index(self):
+        """ページからスプレッドとそのインデックスを引く索引を作り直す (スプレッドの増減時に呼ぶ)"""
+        self._page_to_spread = {}
         for i, spread in enumerate(self.spreads):
-            if target_page in [spread.left_page, spread.right_page]:
-                return i, spread
-        return -1, None
+            self._page_to_spread[spread.left_page] = (i, spread)
+            self._page_to_spread[spread.right_page] = (i, spread)
+
+    def set_page_image(self, page, image_path):
+        """ページに画像を設定する"""
+        spread_idx, spread = self.find_spread_and_page(page)
+        if spread_idx == -1:
+            return
+
+        if spread.get_page_index(page) == 0:
+            self.left_paths[spread_idx] = image_path
+        else:
+            self.right_paths[spread_idx] = image_path
+        # 同じファイルを選び直した場合も読み直す
+        clear_image_caches()
+        # 読み込みは他のページと同じくワーカースレッドで行う
+        page.set_image_path(image_path)
+        self.request_page_image(page)
 
     def swap_with_prev_page(self, current_page):
         spread_idx, spread = self.find_spread_and_page(current_page)
@@ -284,16 +854,17 @@ class BookLayoutApp(QMainWindow):
             return
 
         page_idx = spread.get_page_index(current_page)
+        left, right = self.left_paths, self.right_paths
 
         # 左ページの場合、前のスプレッドの右ページと入れ替え
         if page_idx == 0 and spread_idx > 0:
-            prev_spread = self.spreads[spread_idx - 1]
-            self.swap_pages(current_page, prev_spread.right_page)
+            left[spread_idx], right[spread_idx - 1] = right[spread_idx - 1], left[spread_idx]
 
         # 右ページの場合、同じスプレッドの左ページと入れ替え
         elif page_idx == 1:
-            self.swap_pages(current_page, spread.left_page)
+            left[spread_idx], right[spread_idx] = right[spread_idx], left[spread_idx]
 
+        self.refresh_spreads()
         self.update_all_page_numbers()
 
     def swap_with_next_page(self, current_page):
@@ -302,79 +873,60 @@ class BookLayoutApp(QMainWindow):
             return
 
         page_idx = spread.get_page_index(current_page)
+        left, right = self.left_paths, self.right_paths
 
         # 左ページの場合、同じスプレッドの右ページと入れ替え
         if page_idx == 0:
-            self.swap_pages(current_page, spread.right_page)
+            left[spread_idx], right[spread_idx] = right[spread_idx], left[spread_idx]
 
         # 右ページの場合、次のスプレッドの左ページと入れ替え
         elif page_idx == 1 and spread_idx < len(self.spreads) - 1:
-            next_spread = self.spreads[spread_idx + 1]
-            self.swap_pages(current_page, next_spread.left_page)
+            right[spread_idx], left[spread_idx + 1] = left[spread_idx + 1], right[spread_idx]
 
+        self.refresh_spreads()
         self.update_all_page_numbers()
 
-    def swap_pages(self, page1, page2):
-        """2つのページの内容を入れ替え"""
-        temp_path = page1.image_path
-        temp_pixmap = page1.image_label.pixmap()
-
-        if page2.image_path:
-            page1.load_image(page2.image_path)
-        else:
-            page1.load_image("")
-
-        if temp_path:
-            page2.load_image(temp_path)
-        else:
-            page2.load_image("")
-
     def insert_new_page_before(self, current_page):
         spread_idx, spread = self.find_spread_and_page(current_page)
         if spread_idx == -1:
             return
 
         page_idx = spread.get_page_index(current_page)
+        left, right = self.left_paths, self.right_paths
 
         # 左ページの前に挿入する場合
         if page_idx == 0:
             # 前のスプレッドがある場合は、その右ページを分割して新しいスプレッドを作る
             if spread_idx > 0:
-                prev_spread = self.spreads[spread_idx - 1]
-                # 新しいスプレッドを作成
-                new_spread = SpreadWidget(self.current_page_width)
-                # 前のスプレッドの右ページの内容を新しいスプレッドの左ページに移動
-                new_spread.left_page.load_image(prev_spread.right_page.image_path)
-                # 現在のスプレッドの内容を右に移動
-                new_spread.right_page.load_image(spread.left_page.image_path)
-                spread.left_page.load_image(spread.right_page.image_path)
+                # 前のスプレッドの右ページの内容を新しいスプレッドの左ページに、
+                # 現在のスプレッドの左ページの内容を新しいスプレッドの右ページに移動
+                new_left, new_right = right[spread_idx - 1], left[spread_idx]
+                # 現在のスプレッドの右ページの内容を左に移動
+                left[spread_idx] = right[spread_idx]
                 # 前のスプレッドの右ページと現在のスプレッドの右ページをクリア
-                prev_spread.right_page.load_image("")
-                spread.right_page.load_image("")
+                right[spread_idx - 1] = ""
+                right[spread_idx] = ""
                 # 新しいスプレッドを挿入
-                self.spreads.insert(spread_idx, new_spread)
+                left.insert(spread_idx, new_left)
+                right.insert(spread_idx, new_right)
             else:
-                # 最初のスプレッドの場合は、新しいスプレッドを作成して現在の内容を移動
-                new_spread = SpreadWidget(self.current_page_width)
-                # 現在のスプレッドの内容を新しいスプレッドにコピー
-                new_spread.left_page.load_image(spread.left_page.image_path)
-                new_spread.right_page.load_image(spread.right_page.image_path)
+                # 最初のスプレッドの場合は、現在の内容を新しいスプレッドにコピー
+                new_left, new_right = left[spread_idx], right[spread_idx]
                 # 現在のスプレッドの左ページをクリアして右ページに元の左ページの内容を移動
-                temp_left_image = spread.left_page.image_path
-                spread.left_page.load_image("")
-                spread.right_page.load_image(temp_left_image)
+                right[spread_idx] = left[spread_idx]
+                left[spread_idx] = ""
                 # 新しいスプレッドを追加
-                self.spreads.insert(spread_idx + 1, new_spread)
+                left.insert(spread_idx + 1, new_left)
+                right.insert(spread_idx + 1, new_right)
 
         # 右ページの前に挿入する場合
         elif page_idx == 1:
             # 右ページの内容を新しいスプレッドの左ページに移動
-            new_spread = SpreadWidget(self.current_page_width)
-            new_spread.left_page.load_image(spread.right_page.image_path)
-            spread.right_page.load_image("")
-            self.spreads.insert(spread_idx + 1, new_spread)
+            left.insert(spread_idx + 1, right[spread_idx])
+            right.insert(spread_idx + 1, "")
+            right[spread_idx] = ""
 
-        self.reorganize_layout()
+        self.refresh_spreads()
         self.update_all_page_numbers()
 
     def insert_new_page_after(self, current_page):
@@ -383,35 +935,33 @@ class BookLayoutApp(QMainWindow):
             return
 
         page_idx = spread.get_page_index(current_page)
+        left, right = self.left_paths, self.right_paths
 
         # 左ページの後に挿入する場合
         if page_idx == 0:
             # 右ページの内容を新しいスプレッドの左ページに移動
-            new_spread = SpreadWidget(self.current_page_width)
-            new_spread.left_page.load_image(spread.right_page.image_path)
-            spread.right_page.load_image("")
-            self.spreads.insert(spread_idx + 1, new_spread)
+            left.insert(spread_idx + 1, right[spread_idx])
+            right.insert(spread_idx + 1, "")
+            right[spread_idx] = ""
 
         # 右ページの後に挿入する場合
         elif page_idx == 1:
             # 次のスプレッドがある場合
             if spread_idx < len(self.spreads) - 1:
-                next_spread = self.spreads[spread_idx + 1]
-                # 新しいスプレッドを作成
-                new_spread = SpreadWidget(self.current_page_width)
                 # 次のスプレッドの左ページの内容を新しいスプレッドの右ページに移動
-                new_spread.right_page.load_image(next_spread.left_page.image_path)
+                new_right = left[spread_idx + 1]
                 # 次のスプレッドの内容を左に移動
-                next_spread.left_page.load_image(next_spread.right_page.image_path)
-                next_spread.right_page.load_image("")
+                left[spread_idx + 1] = right[spread_idx + 1]
+                right[spread_idx + 1] = ""
                 # 新しいスプレッドを挿入
-                self.spreads.insert(spread_idx + 1, new_spread)
+                left.insert(spread_idx + 1, "")
+                right.insert(spread_idx + 1, new_right)
             else:
                 # 最後のスプレッドの場合は、新しいスプレッドを追加
-                new_spread = SpreadWidget(self.current_page_width)
-                self.spreads.append(new_spread)
+                left.append("")
+                right.append("")
 
-        self.reorganize_layout()
+        self.refresh_spreads()
         self.update_all_page_numbers()
 
     def delete_page(self, current_page):
@@ -420,6 +970,7 @@ class BookLayoutApp(QMainWindow):
             return
 
         page_idx = spread.get_page_index(current_page)
+        left, right = self.left_paths, self.right_paths
 
         # 削除前の確認
         reply = QMessageBox.question(
@@ -434,46 +985,51 @@ class BookLayoutApp(QMainWindow):
             # 左ページを削除する場合
             if page_idx == 0:
                 if spread_idx > 0:
-                    # 前のスプレッドの右ページを現在の左ページに移動
-                    prev_spread = self.spreads[spread_idx - 1]
-                    spread.left_page.load_image(spread.right_page.image_path)
-                    spread.right_page.load_image("")
+                    # 右ページの内容を左ページに移動
+                    left[spread_idx] = right[spread_idx]
+                    right[spread_idx] = ""
                 else:
                     # 最初のスプレッドの場合は左ページを空にする
-                    spread.left_page.load_image("")
+                    left[spread_idx] = ""
 
             # 右ページを削除する場合
             elif page_idx == 1:
-                if spread_idx < len(self.spreads) - 1:
-                    # 次のスプレッドの左ページを現在の右ページに移動
-                    next_spread = self.spreads[spread_idx + 1]
-                    spread.right_page.load_image("")
-                else:
-                    # 最後のスプレッドの場合は右ページを空にする
-                    spread.right_page.load_image("")
+                right[spread_idx] = ""
 
             # 空のスプレッドを削除
-            if not spread.left_page.image_path and not spread.right_page.image_path:
-                if len(self.spreads) > 1:  # 最後の1つは削除しない
-                    spread.setParent(None)
-                    self.spreads.pop(spread_idx)
+            if not left[spread_idx] and not right[spread_idx]:
+                if len(left) > 1:  # 最後の1つは削除しない
+                    left.pop(spread_idx)
+                    right.pop(spread_idx)
 
-            self.reorganize_layout()
+            self.refresh_spreads()
             self.update_all_page_numbers()
 
     def zoom_in(self):
         if self.current_page_width < 1000:
             self.current_page_width = min(1000, int(self.current_page_width * 1.3))
-            self.update_all_page_sizes()
+            self._resizing = True
+            self._pending_size_update = True
+            self.resize_timer.start(250)
 
     def zoom_out(self):
         if self.current_page_width > 200:
             self.current_page_width = max(200, int(self.current_page_width * 0.7))
-            self.update_all_page_sizes()
+            self._resizing = True
+            self._pending_size_update = True
+            self.resize_timer.start(250)
 
     def update_all_page_sizes(self):
-        for spread in self.spreads:
-            spread.update_page_size(self.current_page_width)
+        # 全ページの更新をまとめて 1 回の再描画にする
+        self.scroll_widget.setUpdatesEnabled(False)
+        self.scroll_widget.blockSignals(True)
+        try:
+            for spread in self.spreads:
+                spread.update_page_size(self.current_page_width, self._resizing)
+        finally:
+            self.scroll_widget.blockSignals(False)
+            self.scroll_widget.setUpdatesEnabled(True)
+            self.scroll_widget.update()
         self.reorganize_layout()
 
     def new_book(self):
@@ -488,9 +1044,8 @@ class BookLayoutApp(QMainWindow):
 
         if reply == QMessageBox.StandardButton.Yes:
             # すべてのスプレッドを削除
-            for spread in self.spreads:
-                spread.setParent(None)
-            self.spreads.clear()
+            self.clear_spreads()
+            clear_image_caches()
 
             # 初期値をリセット
             self.current_page_width = 300
@@ -500,8 +1055,6 @@ class BookLayoutApp(QMainWindow):
             # 初期ページを追加
             self.add_new_spread()
 
-            self.reorganize_layout()
-
     def save_book(self):
         # 保存するデータの構築
         book_data = {
@@ -514,13 +1067,13 @@ class BookLayoutApp(QMainWindow):
         }
 
         # 各スプレッドのデータを保存
-        for spread in self.spreads:
+        for left_path, right_path in zip(self.left_paths, self.right_paths):
             spread_data = {
                 "left_page": {
-                    "image_path": spread.left_page.image_path
+                    "image_path": left_path
                 },
                 "right_page": {
-                    "image_path": spread.right_page.image_path
+                    "image_path": right_path
                 }
             }
             book_data["spreads"].append(spread_data)
@@ -538,8 +1091,12 @@ class BookLayoutApp(QMainWindow):
                 file_name += '.book.json'
 
             try:
-                with open(file_name, 'w', encoding='utf-8') as f:
-                    json.dump(book_data, f, ensure_ascii=False, indent=2)
+                if orjson is not None:
+                    with open(file_name, 'wb') as f:
+                        f.write(orjson.dumps(book_data))
+                else:
+                    with open(file_name, 'w', encoding='utf-8') as f:
+                        json.dump(book_data, f, ensure_ascii=False, separators=(',', ':'))
             except Exception as e:
                 QMessageBox.critical(self, "保存エラー", f"ファイルの保存中にエラーが発生しました:\n{str(e)}")
 
@@ -566,40 +1123,38 @@ class BookLayoutApp(QMainWindow):
 
         if file_name:
             try:
-                with open(file_name, 'r', encoding='utf-8') as f:
-                    book_data = json.load(f)
+                if orjson is not None:
+                    with open(file_name, 'rb') as f:
+                        book_data = orjson.loads(f.read())
+                else:
+                    with open(file_name, 'r', encoding='utf-8') as f:
+                        book_data = json.load(f)
 
-                # 現在のスプレッドをクリア
-                for spread in self.spreads:
-                    spread.setParent(None)
-                self.spreads.clear()
+                settings = book_data.get("settings", {})
+                spreads_data = book_data.get("spreads", [])
+                left_paths = [spread_data.get("left_page", {}).get("image_path", "")
+                              for spread_data in spreads_data]
+                right_paths = [spread_data.get("right_page", {}).get("image_path", "")
+                               for spread_data in spreads_data]
+
+                # 現在のスプレッドとキャッシュをクリア
+                self.clear_spreads()
+                clear_image_caches()
 
                 # 設定を読み込み
-                settings = book_data.get("settings", {})
                 self.current_page_width = settings.get("page_width", 300)
                 self.page_number_start = settings.get("page_number_start", 1)
                 self.show_page_numbers = settings.get("show_page_numbers", True)
 
-                # スプレッドを再作成
-                for spread_data in book_data.get("spreads", []):
-                    spread = SpreadWidget(self.current_page_width)
-
-                    # 左ページの画像を読み込み
-                    left_image_path = spread_data.get("left_page", {}).get("image_path", "")
-                    if left_image_path and os.path.exists(left_image_path):
-                        spread.left_page.load_image(left_image_path)
-
-                    # 右ページの画像を読み込み
-                    right_image_path = spread_data.get("right_page", {}).get("image_path", "")
-                    if right_image_path and os.path.exists(right_image_path):
-                        spread.right_page.load_image(right_image_path)
-
-                    self.spreads.append(spread)
+                # 画像パスを読み込み (存在しない画像は空ページにする)
+                existing_paths = find_existing_paths(left_paths + right_paths)
+                self.left_paths.extend(path if path in existing_paths else "" for path in left_paths)
+                self.right_paths.extend(path if path in existing_paths else "" for path in right_paths)
 
+                # スプレッドを再作成してレイアウトを再構成
+                self.refresh_spreads()
                 # ページ番号を更新
                 self.update_all_page_numbers()
-                # レイアウトを再構成
-                self.reorganize_layout()
 
             except Exception as e:
                 QMessageBox.critical(self, "読み込みエラー", f"ファイルの読み込み中にエラーが発生しました:\n{str(e)}")